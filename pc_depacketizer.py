@@ -1,6 +1,72 @@
 import struct
 import csv
+from functools import lru_cache
 from pathlib import Path
+from typing import Final, List, Optional, Tuple, Union
+
+# Header type codes, matching the DataType enum in mcu_packetizer.h
+DATA_TYPE_INT: Final = 0x01     # uint8
+DATA_TYPE_FLOAT: Final = 0x02   # float32
+DATA_TYPE_DOUBLE: Final = 0x03  # float64
+
+# struct format character for each type code the protocol defines
+_TYPE_CHARS: Final = {DATA_TYPE_INT: "B", DATA_TYPE_FLOAT: "f", DATA_TYPE_DOUBLE: "d"}
+
+# Payload item size for every possible type code byte, None if unsupported
+TYPE_SIZES: Final[Tuple[Optional[int], ...]] = tuple(
+    struct.calcsize("<" + _TYPE_CHARS[code]) if code in _TYPE_CHARS else None
+    for code in range(256)
+)
+
+@lru_cache(maxsize=256)
+def _struct_for(type_code: int, num_vars: int) -> struct.Struct:
+    # Compiled payload layout keyed by the raw header bytes, so the format
+    # string is only built (and the type code only validated) on a cache miss
+    type_char = _TYPE_CHARS.get(type_code)
+    if type_char is None:
+        raise ValueError(f"Unknown type code: {type_code:#04x}")
+    return struct.Struct("<" + str(num_vars) + type_char)
+
+def take_frames(buf: bytearray, resyncing: bool = True) -> Tuple[List[bytes], int, bool]:
+    """
+    Remove every complete packet from the front of a receive buffer.
+
+    Returns the packets in order, the number of bytes skipped because they
+    could not start a valid header, and whether the stream is still
+    resyncing; pass that flag back in on the next call. A partial packet
+    at the end is left in buf to be completed by the next read.
+
+    Slave addresses can collide with type codes, so a header is only
+    trusted if the type byte of the packet after it is valid too. While
+    resyncing (at the start of a stream, or after any skipped byte) a
+    packet is held in buf until that byte arrives; once in sync, a packet
+    that ends the buffer is taken as is.
+    """
+    frames = []
+    skipped = 0
+    while len(buf) >= 3:
+        type_size = TYPE_SIZES[buf[1]]
+        # packet_init() refuses a count of 0, so it can't start a header
+        if type_size is not None and buf[2]:
+            frame_len = 3 + type_size * buf[2]
+            if len(buf) < frame_len:
+                break
+            if len(buf) > frame_len + 1:
+                trusted = TYPE_SIZES[buf[frame_len + 1]] is not None
+            elif resyncing:
+                break  # wait for the next header before trusting this one
+            else:
+                trusted = True
+            if trusted:
+                frames.append(bytes(buf[:frame_len]))
+                del buf[:frame_len]
+                resyncing = False
+                continue
+        # Not a header, slide forward one byte to resync
+        del buf[:1]
+        skipped += 1
+        resyncing = True
+    return frames, skipped, resyncing
 
 class DataDepacketizer:
     def __init__(self, source_path = None, csv_file=None):
@@ -8,27 +74,31 @@ class DataDepacketizer:
         self.source_path = Path(source_path) if source_path else None
         self.data = []
 
-    def depacketize(self, data: bytes):
+    def depacketize(self, data: Union[bytes, bytearray, memoryview]):
         """
         Expected packet:
         [ address(1) | type_code(1) | num_vars(1) | payload... ]
+
+        Any bytes-like object works (bytes, bytearray, memoryview); the
+        payload is decoded in place, so a memoryview slice of a larger
+        receive buffer is parsed without copying.
         """
         if len(data) < 3:
             raise ValueError("Packet too short")
 
         address = data[0]
-        type_code = chr(data[1])
+        type_code = data[1]
         num_vars = data[2]
 
-        fmt = "<" + str(num_vars) + type_code
-        payload = data[3:]
+        layout = _struct_for(type_code, num_vars)
 
-        if len(payload) != struct.calcsize(fmt):
+        if len(data) - 3 != layout.size:
             raise ValueError("Payload size mismatch")
 
-        values = struct.unpack(fmt, payload)
-        self.data.append([address] + list(values))
-        return [address] + list(values)
+        values = layout.unpack_from(data, 3)
+        row = [address, *values]
+        self.data.append(row)
+        return row[:]
 
     def readFromCSVs(self, source_path = None):
         # Use saved source path if none provided
@@ -52,13 +122,11 @@ class DataDepacketizer:
             with open(csv_f, newline="") as f:
                 reader = csv.reader(f)
                 for row in reader:
-                    # Convert CSV string values to ints
+                    # Convert the row of two-digit hex strings to bytes in one call
                     try:
-                        byte_values = [int(x, 16) for x in row]  # hex to int
+                        packet = bytes.fromhex(" ".join(row))
                     except ValueError:
                         raise ValueError(f"Invalid byte value in {csv_f}: {row}")
-                    # Make bytes object
-                    packet = bytes(byte_values)
                     # Pass to depacketize
                     self.depacketize(packet)
         
@@ -75,9 +143,7 @@ class DataDepacketizer:
 
         #writing to csv
         with open(csv_path, mode="a", newline="") as f:
-            writer = csv.writer(f)
-            for d in self.data:
-                writer.writerow(d)
+            csv.writer(f).writerows(self.data)
         
     def outputList(self):
         return self.data
@@ -97,10 +163,10 @@ def test_depacketize():
 
     # --- TEST CASE 1: single float value ---
     address = 1
-    type_code = 'f'
+    type_code = DATA_TYPE_FLOAT
     num_vars = 1
     payload = struct.pack('<f', 3.14)
-    packet = bytes([address]) + bytes(type_code, 'ascii') + bytes([num_vars]) + payload
+    packet = bytes([address, type_code, num_vars]) + payload
 
     result = dp.depacketize(packet)
     assert len(result) == 2, "Test 1 failed: length mismatch"
@@ -109,16 +175,16 @@ def test_depacketize():
 
     # --- TEST CASE 2: multiple integers ---
     address = 5
-    type_code = 'i'
+    type_code = DATA_TYPE_INT
     num_vars = 3
-    payload = struct.pack('<3i', 10, 20, 30)
-    packet = bytes([address]) + bytes(type_code, 'ascii') + bytes([num_vars]) + payload
+    payload = struct.pack('<3B', 10, 20, 30)
+    packet = bytes([address, type_code, num_vars]) + payload
 
     result = dp.depacketize(packet)
     assert result == [5, 10, 20, 30], "Test 2 failed"
 
     # --- TEST CASE 3: packet too short ---
-    short_packet = bytes([1, ord('f')])
+    short_packet = bytes([1, DATA_TYPE_FLOAT])
     try:
         dp.depacketize(short_packet)
         assert False, "Test 3 failed: expected ValueError for short packet"
@@ -127,10 +193,10 @@ def test_depacketize():
 
     # --- TEST CASE 4: payload size mismatch ---
     address = 2
-    type_code = 'f'
+    type_code = DATA_TYPE_FLOAT
     num_vars = 2
     payload = struct.pack('<f', 1.23)  # only 1 float instead of 2
-    packet = bytes([address]) + bytes(type_code, 'ascii') + bytes([num_vars]) + payload
+    packet = bytes([address, type_code, num_vars]) + payload
 
     try:
         dp.depacketize(packet)
@@ -152,8 +218,84 @@ def test_depacketize():
             else:
                 assert dp.data[i][j] == val, f"Test 5 failed at data[{i}][{j}]"
 
+    # --- TEST CASE 6: bytearray / memoryview input ---
+    packet = bytes([7, DATA_TYPE_DOUBLE, 2]) + struct.pack('<2d', 1.5, -2.25)
+    stream = bytearray(b"\x00\x00" + packet + b"\xff")
+    result = dp.depacketize(memoryview(stream)[2:2 + len(packet)])
+    assert result == [7, 1.5, -2.25], "Test 6 failed: memoryview input"
+    result = dp.depacketize(bytearray(packet))
+    assert result == [7, 1.5, -2.25], "Test 6 failed: bytearray input"
+
+    # --- TEST CASE 7: unknown type code (struct characters are not wire codes) ---
+    try:
+        dp.depacketize(bytes([1, ord('f'), 1]) + struct.pack('<f', 1.0))
+        assert False, "Test 7 failed: expected ValueError for unknown type code"
+    except ValueError:
+        pass  # expected
+
     print("All depacketize tests passed!")
 
+def test_take_frames():
+    float_packet = bytes([0x10, DATA_TYPE_FLOAT, 2]) + struct.pack('<2f', 1.5, -0.5)
+    int_packet = bytes([1, DATA_TYPE_INT, 3, 10, 0x0a, 30])
+
+    # --- TEST CASE 1: back-to-back packets in one read ---
+    buf = bytearray(int_packet + float_packet)
+    frames, skipped, resyncing = take_frames(buf)
+    assert frames == [int_packet, float_packet], "Test 1 failed: wrong frames"
+    assert skipped == 0 and not buf, "Test 1 failed: buffer not consumed"
+
+    # --- TEST CASE 2: packet split across reads of an in-sync stream ---
+    buf = bytearray(float_packet[:5])
+    frames, skipped, resyncing = take_frames(buf, resyncing=False)
+    assert frames == [] and buf == float_packet[:5], "Test 2 failed: partial frame taken"
+    buf += float_packet[5:]
+    frames, skipped, resyncing = take_frames(buf, resyncing)
+    assert frames == [float_packet] and not buf, "Test 2 failed: frame not joined"
+
+    # --- TEST CASE 3: while resyncing, a packet waits for the next header ---
+    buf = bytearray(int_packet)
+    frames, skipped, resyncing = take_frames(buf)
+    assert frames == [] and resyncing, "Test 3 failed: unconfirmed frame taken"
+    buf += float_packet
+    frames, skipped, resyncing = take_frames(buf, resyncing)
+    assert frames == [int_packet, float_packet], "Test 3 failed: frames not confirmed"
+
+    # --- TEST CASE 4: partial trailing frame stays buffered ---
+    buf = bytearray(int_packet + float_packet[:4])
+    frames, skipped, resyncing = take_frames(buf)
+    assert frames == [int_packet], "Test 4 failed: wrong frames"
+    assert buf == float_packet[:4], "Test 4 failed: trailing bytes lost"
+
+    # --- TEST CASE 5: resync after a junk byte ---
+    buf = bytearray(b"\xaa" + float_packet + int_packet)
+    frames, skipped, resyncing = take_frames(buf)
+    assert frames == [float_packet, int_packet], "Test 5 failed: did not resync"
+    assert skipped == 1, "Test 5 failed: wrong skip count"
+
+    # --- TEST CASE 6: resync on firmware traffic, whose addresses are also type codes ---
+    firmware_int = bytes([1, DATA_TYPE_INT, 3, 10, 20, 30])
+    firmware_float = bytes([2, DATA_TYPE_FLOAT, 2]) + struct.pack('<2f', 3.5, 0.25)
+    buf = bytearray(b"\xaa" + firmware_int + firmware_float)
+    frames, skipped, resyncing = take_frames(buf)
+    assert frames == [firmware_int, firmware_float], "Test 6 failed: junk byte taken as address"
+    assert skipped == 1 and not resyncing, "Test 6 failed: resync not confirmed"
+
+    # --- TEST CASE 7: zero-count header is rejected ---
+    buf = bytearray(bytes([0x10, DATA_TYPE_INT, 0]) + firmware_int + firmware_float)
+    frames, skipped, resyncing = take_frames(buf)
+    assert frames == [firmware_int, firmware_float] and skipped == 3, "Test 7 failed: zero count accepted"
+
+    # --- TEST CASE 8: firmware stream decodes end to end ---
+    dp = DataDepacketizer()
+    buf = bytearray(bytes([1, DATA_TYPE_INT, 3, 10, 20, 30])
+                    + bytes([2, DATA_TYPE_FLOAT, 2]) + struct.pack('<2f', 3.5, 0.25))
+    frames, skipped, resyncing = take_frames(buf)
+    assert [dp.depacketize(f) for f in frames] == [[1, 10, 20, 30], [2, 3.5, 0.25]], \
+        "Test 8 failed: firmware packets not framed"
+
+    print("All take_frames tests passed!")
+
 def test_all():
     test_dir = Path("test_dir")
     test_dir.mkdir(exist_ok=True)
@@ -164,8 +306,8 @@ def test_all():
 
     # Packets for test1.csv: [address, type_code, num_vars, payload...]
     packets1 = [
-        [1, ord('f'), 2] + list(struct.pack("<ff", 3.14, 2.71)),
-        [2, ord('i'), 3] + list(struct.pack("<iii", 10, 20, 30)),
+        [1, DATA_TYPE_FLOAT, 2] + list(struct.pack("<ff", 3.14, 2.71)),
+        [2, DATA_TYPE_INT, 3] + list(struct.pack("<BBB", 10, 20, 30)),
     ]
 
     # Write packets1 as hex strings
@@ -176,8 +318,8 @@ def test_all():
 
     # Packets for test2.csv: different data
     packets2 = [
-        [3, ord('f'), 1] + list(struct.pack("<f", 1.23)),
-        [4, ord('i'), 2] + list(struct.pack("<ii", 100, 200)),
+        [3, DATA_TYPE_FLOAT, 1] + list(struct.pack("<f", 1.23)),
+        [4, DATA_TYPE_INT, 2] + list(struct.pack("<BB", 100, 200)),
     ]
 
     # Write packets2 as hex strings
@@ -197,4 +339,5 @@ def test_all():
 
 if __name__ =="__main__":
     test_depacketize()
+    test_take_frames()
     test_all()
\ No newline at end of file
@@ -1,6 +1,8 @@
 import serial
 import os
-import csv
+import queue
+import threading
+from pc_depacketizer import take_frames
 
 class SerialListener:
     def __init__(self, port, baudrate=9600, timeout=1.0, path="./byte_data.csv"):
@@ -27,15 +29,69 @@ class SerialListener:
         else:
             print("Serial connection not created yet.")
     
+    def write_packets(self, f, packets, stop, errors): #drains queued packets to the csv file in batches
+        try:
+            while not (stop.is_set() and packets.empty()):
+                try:
+                    batch = [packets.get(timeout=0.1)]
+                except queue.Empty:
+                    continue
+                while len(batch) < 256:
+                    try:
+                        batch.append(packets.get_nowait())
+                    except queue.Empty:
+                        break
+                f.write(''.join(p.hex(',') + '\n' for p in batch)) #hex cells need no csv quoting
+                f.flush()
+        except OSError as e: #kept for listen() to re-raise on the caller's thread
+            errors.append(e)
+
+    def check_writer(self, writer, errors): #stops listen() once the writer thread has died
+        if not writer.is_alive():
+            cause = errors[0] if errors else None
+            raise RuntimeError(f"Writing to {self.path} failed ({cause}), stopping listener") from cause
+
     def listen(self): #send packet data to csv fileno 
         if not self.ser:
             print("Serial connection not created yet.")
             return
-        while True:
-            ser_bytes = self.ser.readline() #readline() depends on newline character
-            with open(self.path, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([f"{b:02x}" for b in ser_bytes])
+        #opened here, not on the writer thread, so open errors reach the caller
+        f = open(self.path, 'a', newline='', buffering=1 << 16) #open once, not per packet
+        #serial reads stay on this thread; disk writes happen on the writer thread
+        packets = queue.Queue(maxsize=4096)
+        stop = threading.Event()
+        errors = [] #exception that stopped the writer thread, if any
+        writer = threading.Thread(target=self.write_packets, args=(f, packets, stop, errors), daemon=True)
+        writer.start()
+        buf = bytearray() #bytes received but not yet framed into a packet
+        skipped = 0 #bytes dropped since the stream was last in sync
+        resyncing = True #alignment is unknown until a frame is confirmed by the next header
+        try:
+            while True:
+                self.check_writer(writer, errors)
+                buf += self.ser.read(self.ser.in_waiting or 1) #waits up to timeout when idle
+                frames, dropped, resyncing = take_frames(buf, resyncing)
+                skipped += dropped
+                if skipped and not resyncing: #report each confirmed resync once, not per dropped byte
+                    print(f"Resynced after skipping {skipped} bytes")
+                    skipped = 0
+                for frame in frames:
+                    while True: #a full queue must not block forever if the writer died
+                        try:
+                            packets.put(frame, timeout=0.5)
+                            break
+                        except queue.Full:
+                            self.check_writer(writer, errors)
+        finally:
+            if skipped:
+                print(f"Skipped {skipped} bytes")
+            stop.set()
+            writer.join() #flush whatever is still queued
+            try:
+                f.close()
+            except OSError:
+                if not errors: #after a failed write, close re-fails on the same buffer
+                    raise
 
 listener = SerialListener(port="/dev/ttyUSB0") #change port as needed
 listener.connect()